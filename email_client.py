@@ -8,9 +8,153 @@ from dotenv import load_dotenv
 import json
 from datetime import datetime
 import html2text
+import threading
+from collections import OrderedDict, deque, namedtuple
+from models import MessageSummary
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed, wait, FIRST_COMPLETED
 
 load_dotenv()
 
+
+def _env_float(name, default):
+    try:
+        return float(os.getenv(name, default))
+    except ValueError:
+        return default
+
+
+# mail.tm allows 8 requests per second per IP
+API_RATE_LIMIT = 8
+BULK_MAX_WORKERS = 4
+MESSAGES_PAGE_SIZE = 30
+# Bodies fetched ahead of time after each listing, and how many are kept
+PREFETCH_LIMIT = 5
+PREFETCH_DELAY = 0.2
+BODY_CACHE_SIZE = 50
+# Network timeouts in seconds, overridable from the environment / .env file
+CONNECT_TIMEOUT = _env_float("TEMPBOX_CONNECT_TIMEOUT", 5)
+READ_TIMEOUT = _env_float("TEMPBOX_READ_TIMEOUT", 15)
+OPERATION_TIMEOUT = _env_float("TEMPBOX_OPERATION_TIMEOUT", 30)
+HEDGE_REQUESTS = os.getenv("TEMPBOX_HEDGE_REQUESTS", "").lower() in ("1", "true", "yes")
+# Hedged GETs fire a second request once the first exceeds the p95 latency
+HEDGE_MIN_SAMPLES = 20
+LATENCY_WINDOW = 200
+
+
+class RateLimiter:
+    """Thread-safe limiter that spaces out API calls to a fixed rate"""
+    def __init__(self, max_per_second=API_RATE_LIMIT):
+        self.interval = 1.0 / max_per_second
+        self._lock = threading.Lock()
+        self._next_slot = 0.0
+
+    def wait(self):
+        """Block until the caller is allowed to make the next request"""
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.interval
+        delay = slot - now
+        if delay > 0:
+            time.sleep(delay)
+
+
+# Outcome of a bulk operation; incomplete is True when the inbox could not be fully listed
+BulkResult = namedtuple("BulkResult", ["succeeded", "failed", "incomplete"])
+
+
+class Deadline:
+    """Overall time budget shared by the steps of a multi-step operation"""
+    def __init__(self, seconds):
+        self.expires_at = time.monotonic() + seconds
+
+    def remaining(self):
+        return self.expires_at - time.monotonic()
+
+    def expired(self):
+        return self.remaining() <= 0
+
+
+class LatencyTracker:
+    """Keeps a sliding window of GET latencies to estimate the p95"""
+    def __init__(self, window=LATENCY_WINDOW):
+        self._samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, seconds):
+        with self._lock:
+            self._samples.append(seconds)
+
+    def p95(self):
+        """Return the 95th percentile latency, or None until enough samples exist"""
+        with self._lock:
+            if len(self._samples) < HEDGE_MIN_SAMPLES:
+                return None
+            ordered = sorted(self._samples)
+        return ordered[int(len(ordered) * 0.95) - 1]
+
+
+class BodyPrefetcher:
+    """Fetches bodies of the newest/unseen listed messages in the background.
+
+    A single low-priority worker fetches at most `limit` bodies per listing
+    into the client's body cache. Scheduling a new listing or calling
+    cancel() (on account switch) abandons any run still in progress.
+    """
+    def __init__(self, client, limit=PREFETCH_LIMIT):
+        self.client = client
+        self.limit = limit
+        self._lock = threading.Lock()
+        self._generation = 0
+
+    def schedule(self, messages):
+        """Start prefetching for a fresh listing, replacing any previous run"""
+        token = self.client.token
+        with self._lock:
+            self._generation += 1
+            generation = self._generation
+        if self.limit <= 0 or not token or not messages:
+            return
+        
+        # Listings are newest first, so a stable sort puts unseen newest first
+        candidates = sorted(messages, key=lambda msg: msg.seen)
+        message_ids = [msg.id for msg in candidates if not self.client.has_cached_body(msg.id)][:self.limit]
+        if message_ids:
+            threading.Thread(target=self._run, args=(generation, token, message_ids), daemon=True).start()
+
+    def cancel(self):
+        """Abandon any prefetch in progress"""
+        with self._lock:
+            self._generation += 1
+
+    def _is_current(self, generation):
+        return generation == self._generation
+
+    def _run(self, generation, token, message_ids):
+        for message_id in message_ids:
+            # Leave room for interactive requests between background fetches
+            time.sleep(PREFETCH_DELAY)
+            if not self._is_current(generation):
+                return
+            try:
+                response = self.client._request(
+                    "GET", f"/messages/{message_id}",
+                    headers={"Authorization": f"Bearer {token}"}
+                )
+                response.raise_for_status()
+                message = response.json()
+            except (requests.exceptions.RequestException, ValueError):
+                continue
+            if self._is_current(generation):
+                self.client.cache_body(message_id, message)
+
+
+def _close_response(future):
+    """Release the connection held by the losing copy of a hedged request"""
+    if not future.cancelled() and future.exception() is None:
+        future.result().close()
+
+
 class TempEmailClient:
     def __init__(self):
         self.base_url = "https://api.mail.tm"
@@ -19,18 +163,123 @@ class TempEmailClient:
         self.token = None
         self.domain = None
         self.current_password = None
+        self.rate_limiter = RateLimiter()
+        self.connect_timeout = CONNECT_TIMEOUT
+        self.read_timeout = READ_TIMEOUT
+        self.operation_timeout = OPERATION_TIMEOUT
+        self.hedge_requests = HEDGE_REQUESTS
+        self.latency = LatencyTracker()
+        self._body_cache = OrderedDict()
+        self._body_cache_lock = threading.Lock()
+        self.prefetcher = BodyPrefetcher(self)
 
     def reset_state(self):
         """Reset the client state between account switches"""
+        self.prefetcher.cancel()
+        self.clear_body_cache()
         self.account = None
         self.token = None
         self.current_password = None
         self.session.headers.pop('Authorization', None)
+
+    def _timeout(self, deadline=None):
+        """Per-call (connect, read) timeout, clipped to what is left of the deadline"""
+        if deadline is None:
+            return (self.connect_timeout, self.read_timeout)
+        remaining = deadline.remaining()
+        if remaining <= 0:
+            raise requests.exceptions.Timeout("Operation deadline exceeded")
+        return (min(self.connect_timeout, remaining), min(self.read_timeout, remaining))
+
+    def _request(self, method, path, deadline=None, **kwargs):
+        """Send a rate-limited API request with timeouts applied"""
+        self.rate_limiter.wait()
+        kwargs['timeout'] = self._timeout(deadline)
+        url = f"{self.base_url}{path}"
+        if method != "GET":
+            return self.session.request(method, url, **kwargs)
+        if self.hedge_requests:
+            hedge_after = self.latency.p95()
+            if hedge_after is not None:
+                return self._hedged_get(url, hedge_after, deadline, kwargs)
+        return self._timed_get(url, kwargs)
+
+    def _timed_get(self, url, kwargs):
+        start = time.monotonic()
+        try:
+            return self.session.get(url, **kwargs)
+        finally:
+            # Failed and timed-out requests are the slow tail, so count them too
+            self.latency.record(time.monotonic() - start)
+
+    def _spawn_get(self, url, kwargs):
+        """Start a GET on its own thread so it never waits in a shared pool queue"""
+        future = Future()
+        
+        def run():
+            future.set_running_or_notify_cancel()
+            try:
+                future.set_result(self._timed_get(url, kwargs))
+            except BaseException as e:
+                future.set_exception(e)
         
-    def get_domains(self):
+        threading.Thread(target=run, daemon=True).start()
+        return future
+
+    def _hedged_get(self, url, hedge_after, deadline, kwargs):
+        """Issue a GET and, if it is slower than hedge_after, race a second copy"""
+        first = self._spawn_get(url, kwargs)
+        done, _ = wait([first], timeout=hedge_after)
+        if done or (deadline is not None and deadline.remaining() <= hedge_after):
+            return first.result()
+        
+        self.rate_limiter.wait()
+        # The backup copy only gets what is left of the deadline
+        hedge_kwargs = dict(kwargs, timeout=self._timeout(deadline))
+        second = self._spawn_get(url, hedge_kwargs)
+        copies = [first, second]
+        done, pending = wait(copies, return_when=FIRST_COMPLETED)
+        # Both copies may have finished together; prefer one that succeeded
+        winner = next((copy for copy in copies if copy in done and copy.exception() is None), None)
+        if winner is None:
+            # Every finished copy failed, so the result rests on the other one
+            return pending.pop().result() if pending else first.result()
+        for copy in copies:
+            if copy is not winner:
+                copy.add_done_callback(_close_response)
+        return winner.result()
+
+    def cache_body(self, message_id, message):
+        """Store a full message, evicting the least recently used ones"""
+        with self._body_cache_lock:
+            self._body_cache[message_id] = message
+            self._body_cache.move_to_end(message_id)
+            while len(self._body_cache) > BODY_CACHE_SIZE:
+                self._body_cache.popitem(last=False)
+
+    def get_cached_body(self, message_id):
+        with self._body_cache_lock:
+            message = self._body_cache.get(message_id)
+            if message is not None:
+                self._body_cache.move_to_end(message_id)
+            return message
+
+    def has_cached_body(self, message_id):
+        with self._body_cache_lock:
+            return message_id in self._body_cache
+
+    def evict_body(self, message_id):
+        with self._body_cache_lock:
+            self._body_cache.pop(message_id, None)
+
+    def clear_body_cache(self):
+        with self._body_cache_lock:
+            self._body_cache.clear()
+        
+    def get_domains(self, deadline=None):
         """Get available domains for email creation"""
         try:
-            response = self.session.get(f"{self.base_url}/domains")
+            response = self._request("GET", "/domains", deadline)
             response.raise_for_status()
             domains = response.json().get('hydra:member', [])
             if domains:
@@ -49,13 +298,14 @@ class TempEmailClient:
     def authenticate_account(self, email, password):
         """Authenticate an existing account and get a new token"""
         self.reset_state()  # Reset state before authenticating
+        deadline = Deadline(self.operation_timeout)
         try:
             # Get token for the account
             token_payload = {
                 "address": email,
                 "password": password
             }
-            token_response = self.session.post(f"{self.base_url}/token", json=token_payload)
+            token_response = self._request("POST", "/token", deadline, json=token_payload)
             token_response.raise_for_status()
             self.token = token_response.json().get('token')
             
@@ -79,8 +329,10 @@ class TempEmailClient:
     def create_account(self, username=None, password=None):
         """Create a new temporary email account"""
         self.reset_state()  # Reset state before creating new account
+        # One budget covers the domain lookup, account creation and token request
+        deadline = Deadline(self.operation_timeout)
         if not self.domain:
-            self.get_domains()
+            self.get_domains(deadline)
             if not self.domain:
                 print("No domains available")
                 return False
@@ -100,7 +352,7 @@ class TempEmailClient:
                 "address": email,
                 "password": password
             }
-            response = self.session.post(f"{self.base_url}/accounts", json=payload)
+            response = self._request("POST", "/accounts", deadline, json=payload)
             response.raise_for_status()
             
             # Then authenticate to get the token
@@ -108,7 +360,7 @@ class TempEmailClient:
                 "address": email,
                 "password": password
             }
-            auth_response = self.session.post(f"{self.base_url}/token", json=auth_payload)
+            auth_response = self._request("POST", "/token", deadline, json=auth_payload)
             auth_response.raise_for_status()
             
             self.token = auth_response.json().get('token')
@@ -136,29 +388,38 @@ class TempEmailClient:
             self.account = None
             return False
 
-    def get_messages(self):
-        """Retrieve messages for the current account"""
-        if not self.token:
+    def get_messages(self, page=1, deadline=None, token=None):
+        """Retrieve message summaries for the current account (or the one token belongs to)"""
+        if not self.token and not token:
             print("No account authenticated")
             return None
         
         try:
-            response = self.session.get(f"{self.base_url}/messages")
+            response = self._request("GET", "/messages", deadline, params={"page": page},
+                                     headers=self._auth_headers(token))
             response.raise_for_status()
-            messages = response.json().get('hydra:member', [])
-            
-            # Process message IDs to ensure they're valid
-            for msg in messages:
-                # Extract the ID from @id if it exists, otherwise use id
-                msg_id = msg.get('@id', '').split('/')[-1]
-                if not msg_id:
-                    msg_id = msg.get('id', '')
-                msg['id'] = msg_id
-            
-            return messages
+            members = response.json().get('hydra:member', [])
+            return [MessageSummary.from_api(msg) for msg in members]
         except requests.exceptions.RequestException as e:
             print(f"Error fetching messages: {e}")
             return None
+
+    def get_all_messages(self, deadline=None, token=None):
+        """Retrieve messages from every page of the current account's inbox.
+
+        Returns (messages, complete); complete is False when a page could not
+        be fetched, in which case messages holds only the pages listed so far.
+        """
+        all_messages = []
+        page = 1
+        while True:
+            messages = self.get_messages(page, deadline, token)
+            if messages is None:
+                return all_messages, False
+            all_messages.extend(messages)
+            if len(messages) < MESSAGES_PAGE_SIZE:
+                return all_messages, True
+            page += 1
     
     def display_messages(self):
         """Display messages in a nice table format with more details"""
@@ -166,6 +427,7 @@ class TempEmailClient:
         if not messages:
             print("No messages found")
             return
+        self.prefetcher.schedule(messages)
         
         table = PrettyTable()
         table.field_names = ["ID", "From", "Subject", "Received At", "Has Attachments"]
@@ -173,11 +435,11 @@ class TempEmailClient:
         
         for msg in messages:
             table.add_row([
-                msg.get('id', 'N/A')[:8],
-                msg.get('from', {}).get('address', 'N/A'),
-                msg.get('subject', 'N/A')[:30] + ('...' if len(msg.get('subject', '')) > 30 else ''),
-                msg.get('createdAt', 'N/A'),
-                'Yes' if msg.get('attachments', []) else 'No'
+                msg.id[:8] or 'N/A',
+                msg.sender,
+                msg.subject[:30] + ('...' if len(msg.subject) > 30 else ''),
+                msg.created_at,
+                'Yes' if msg.has_attachments else 'No'
             ])
         
         print(table)
@@ -192,10 +454,16 @@ class TempEmailClient:
             # Clean up the message ID if it contains the full URL
             if '/' in message_id:
                 message_id = message_id.split('/')[-1]
+            
+            message = self.get_cached_body(message_id)
+            if message is not None:
+                return message
                 
-            response = self.session.get(f"{self.base_url}/messages/{message_id}")
+            response = self._request("GET", f"/messages/{message_id}")
             response.raise_for_status()
-            return response.json()
+            message = response.json()
+            self.cache_body(message_id, message)
+            return message
         except requests.exceptions.RequestException as e:
             print(f"Error fetching message content: {e}")
             return None
@@ -207,23 +475,145 @@ class TempEmailClient:
             return False
         
         try:
-            response = self.session.delete(f"{self.base_url}/messages/{message_id}")
-            response.raise_for_status()
+            self._delete_message_request(message_id, self.token)
             return True
         except requests.exceptions.RequestException as e:
             print(f"Error deleting message: {e}")
             return False
 
+    def mark_message_seen(self, message_id, seen=True):
+        """Mark a specific message as seen (or unseen)"""
+        if not self.token:
+            print("No account authenticated")
+            return False
+        
+        try:
+            self._mark_seen_request(message_id, seen, self.token)
+            return True
+        except requests.exceptions.RequestException as e:
+            print(f"Error updating message: {e}")
+            return False
+
+    def _auth_headers(self, token):
+        """Authorization header pinning a request to one account's token"""
+        return {"Authorization": f"Bearer {token}"} if token else {}
+
+    def _delete_message_request(self, message_id, token):
+        response = self._request("DELETE", f"/messages/{message_id}", headers=self._auth_headers(token))
+        # The request carries the job's own token, so a 404 really means the
+        # message is already gone from that account and counts as deleted
+        if response.status_code != 404:
+            response.raise_for_status()
+        if token == self.token:
+            self.evict_body(message_id)
+
+    def _mark_seen_request(self, message_id, seen, token):
+        headers = self._auth_headers(token)
+        headers["Content-Type"] = "application/merge-patch+json"
+        response = self._request(
+            "PATCH", f"/messages/{message_id}",
+            data=json.dumps({"seen": seen}),
+            headers=headers
+        )
+        response.raise_for_status()
+        cached = self.get_cached_body(message_id) if token == self.token else None
+        if cached is not None:
+            cached['seen'] = seen
+
+    def _run_bulk(self, message_ids, request, on_result=None, max_workers=BULK_MAX_WORKERS):
+        """Run a per-message request concurrently and collect the outcome.
+
+        on_result(message_id, ok) is called as each request finishes so callers
+        can update their views incrementally. Returns (succeeded, failed) lists.
+        """
+        succeeded, failed = [], []
+        if not message_ids:
+            return succeeded, failed
+        
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {executor.submit(request, msg_id): msg_id for msg_id in message_ids}
+            for future in as_completed(futures):
+                msg_id = futures[future]
+                try:
+                    future.result()
+                    ok = True
+                except requests.exceptions.RequestException:
+                    ok = False
+                (succeeded if ok else failed).append(msg_id)
+                if on_result:
+                    on_result(msg_id, ok)
+        return succeeded, failed
+
+    # Bulk jobs capture the token when they start and send it on every
+    # request, so switching accounts mid-job cannot redirect them.
+
+    def delete_messages(self, message_ids, on_result=None, token=None):
+        """Delete several messages concurrently, returns a BulkResult"""
+        token = token or self.token
+        if not token:
+            print("No account authenticated")
+            return BulkResult([], list(message_ids), False)
+        # Stop fetching bodies that are about to be deleted
+        self.prefetcher.cancel()
+        succeeded, failed = self._run_bulk(
+            message_ids, lambda msg_id: self._delete_message_request(msg_id, token), on_result
+        )
+        return BulkResult(succeeded, failed, False)
+
+    def mark_messages_seen(self, message_ids, seen=True, on_result=None, token=None):
+        """Mark several messages as seen/unseen concurrently, returns a BulkResult"""
+        token = token or self.token
+        if not token:
+            print("No account authenticated")
+            return BulkResult([], list(message_ids), False)
+        succeeded, failed = self._run_bulk(
+            message_ids, lambda msg_id: self._mark_seen_request(msg_id, seen, token), on_result
+        )
+        return BulkResult(succeeded, failed, False)
+
+    def delete_all_messages(self, query=None, on_result=None, token=None):
+        """Delete every message, or only those matching the search query.
+
+        The result's incomplete flag is set when the inbox could not be fully
+        listed, so some messages were not processed.
+        """
+        token = token or self.token
+        if not token:
+            print("No account authenticated")
+            return BulkResult([], [], True)
+        message_ids, complete = self._find_message_ids(query, token)
+        result = self.delete_messages(message_ids, on_result, token)
+        return result._replace(incomplete=not complete)
+
+    def mark_all_messages_seen(self, seen=True, query=None, on_result=None, token=None):
+        """Mark every message, or only those matching the search query, as seen/unseen"""
+        token = token or self.token
+        if not token:
+            print("No account authenticated")
+            return BulkResult([], [], True)
+        message_ids, complete = self._find_message_ids(query, token)
+        result = self.mark_messages_seen(message_ids, seen, on_result, token)
+        return result._replace(incomplete=not complete)
+
+    def _find_message_ids(self, query, token):
+        messages, complete = self.get_all_messages(token=token)
+        if query:
+            messages = self.filter_messages(messages, query)
+        return [msg.id for msg in messages], complete
+
+    @staticmethod
+    def filter_messages(messages, query):
+        """Filter messages whose subject or sender contains the query"""
+        query = query.lower()
+        return [msg for msg in messages if msg.matches(query)]
+
     def search_messages(self, query):
         """Search messages by subject or sender"""
         messages = self.get_messages()
         if not messages:
             return []
         
-        query = query.lower()
-        return [msg for msg in messages if 
-                query in msg.get('subject', '').lower() or 
-                query in msg.get('from', {}).get('address', '').lower()]
+        return self.filter_messages(messages, query)
 
     def save_message_to_file(self, message_id):
         """Save a message content to a file"""
@@ -273,14 +663,14 @@ class TempEmailClient:
             return
         
         initial_messages = self.get_messages() or []
-        initial_ids = {msg['id'] for msg in initial_messages}
+        initial_ids = {msg.id for msg in initial_messages}
         
         print(f"Waiting for new messages (checking every {interval} seconds)...")
         
         for _ in range(max_checks):
             time.sleep(interval)
             current_messages = self.get_messages() or []
-            current_ids = {msg['id'] for msg in current_messages}
+            current_ids = {msg.id for msg in current_messages}
             
             new_ids = current_ids - initial_ids
             if new_ids:
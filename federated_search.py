@@ -0,0 +1,115 @@
+import threading
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from email_client import TempEmailClient, RateLimiter, Deadline, OPERATION_TIMEOUT, MESSAGES_PAGE_SIZE
+
+FEDERATED_MAX_WORKERS = 4
+
+# One matching message; higher scores rank first, then newer messages
+SearchHit = namedtuple("SearchHit", ["account", "message", "score"])
+
+
+def score_message(message, query):
+    """Rank how well a message summary matches the (lowercased) query, 0 for no match"""
+    sender = message.sender.lower()
+    if sender == query:
+        return 3
+    if query in sender:
+        return 2
+    if query in message.subject.lower():
+        return 1
+    return 0
+
+
+class _HitCounter:
+    """Counts hits across all account workers and signals them to stop at the limit"""
+    def __init__(self, limit):
+        self.limit = limit
+        self.stop = threading.Event()
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def add(self, count):
+        with self._lock:
+            self._count += count
+            if self.limit and self._count >= self.limit:
+                self.stop.set()
+
+
+def _search_account(account, query, rate_limiter, counter):
+    """Authenticate one stored account and return (matching hits, complete).
+
+    The listing is scored page by page and abandoned as soon as the shared
+    counter reaches its limit; stopping early that way is not a failure.
+    """
+    client = TempEmailClient()
+    # All clients share the caller's limiter since the API limit is per IP
+    client.rate_limiter = rate_limiter
+    if not client.authenticate_account(account["email"], account["password"]):
+        return [], False
+
+    hits = []
+    page = 1
+    while not counter.stop.is_set():
+        # Each page gets its own budget so large inboxes are not cut short
+        messages = client.get_messages(page, Deadline(OPERATION_TIMEOUT))
+        if messages is None:
+            return hits, False
+        page_hits = 0
+        for message in messages:
+            score = score_message(message, query)
+            if score:
+                hits.append(SearchHit(account["email"], message, score))
+                page_hits += 1
+        counter.add(page_hits)
+        if len(messages) < MESSAGES_PAGE_SIZE:
+            break
+        page += 1
+    return hits, True
+
+
+def federated_search(query, accounts, limit=None, max_workers=FEDERATED_MAX_WORKERS, on_hits=None,
+                     rate_limiter=None):
+    """Search several stored accounts concurrently.
+
+    accounts is a list of Storage-style {"email", "password"} dicts. Matches
+    are evaluated as each account's listing arrives and passed to
+    on_hits(hits) if given; once `limit` matches are found the remaining
+    accounts are skipped. Pass the app client's rate_limiter so searches and
+    other traffic share one budget. Returns (hits, failed_accounts) with hits
+    ranked by score and then newest first; an account that could only be
+    partly searched is listed in failed_accounts and still contributes hits.
+    """
+    query = query.lower()
+    if rate_limiter is None:
+        rate_limiter = RateLimiter()
+    counter = _HitCounter(limit)
+    hits, failed = [], []
+
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+    try:
+        futures = {
+            executor.submit(_search_account, account, query, rate_limiter, counter): account["email"]
+            for account in accounts
+        }
+        for future in as_completed(futures):
+            if future.cancelled():
+                continue
+            account_hits, complete = future.result()
+            if not complete:
+                failed.append(futures[future])
+            hits.extend(account_hits)
+            if on_hits and account_hits:
+                on_hits(account_hits)
+            if counter.stop.is_set():
+                # Skip accounts not started yet; running ones stop after their
+                # current page and their hits are still collected
+                for pending in futures:
+                    pending.cancel()
+    finally:
+        executor.shutdown(wait=False)
+
+    hits.sort(key=lambda hit: hit.message.created_at, reverse=True)
+    hits.sort(key=lambda hit: hit.score, reverse=True)
+    return (hits[:limit] if limit else hits), failed
@@ -1,11 +1,25 @@
 import tkinter as tk
-from tkinter import ttk, messagebox
+from tkinter import ttk, messagebox, simpledialog
 from email_client import TempEmailClient
+from federated_search import federated_search
 from storage import Storage
+from refresh_scheduler import RefreshScheduler
+from models import MessageSummary
+from datetime import datetime
+import queue
 import threading
-import time
 import pyperclip  # For clipboard operations
 
+SNAPSHOT_INTERVAL_MS = 60 * 1000
+UI_POLL_INTERVAL_MS = 100
+
+class AuthenticationFailed(Exception):
+    """Raised on the refresh worker when an account cannot be authenticated"""
+    def __init__(self, email, interactive):
+        super().__init__(f"could not authenticate {email}")
+        self.email = email
+        self.interactive = interactive
+
 class EmailApp:
     def __init__(self, root):
         self.root = root
@@ -15,8 +29,14 @@ class EmailApp:
         self.client = TempEmailClient()
         self.storage = Storage()
         self.selected_email = None  # Track selected email
-        self.refresh_thread = None  # Track refresh thread
-        self.is_refreshing = False  # Track refresh state
+        self.current_messages = []  # Summaries shown in the messages list
+        self._auth_needed = None  # (email, password, interactive) to authenticate on the next fetch
+        # Held by worker threads while they sign the shared client in or use its session
+        self._account_lock = threading.Lock()
+        self._last_snapshot = {}
+        # Callbacks posted by background jobs, run on the Tk thread
+        self._ui_queue = queue.Queue()
+        self._background_jobs = 0
         
         # Configure root grid
         self.root.grid_columnconfigure(0, weight=1)
@@ -26,8 +46,21 @@ class EmailApp:
         self._create_main_content()
         self._create_status_bar()
         
-        # Load saved accounts
-        self._load_saved_accounts()
+        # All refreshes (manual and automatic) go through the scheduler
+        self.scheduler = RefreshScheduler(
+            self.root, self._fetch_messages, self._on_refresh_result, self._get_refresh_interval
+        )
+        # Pause auto-refresh while the window is minimized or unfocused
+        for sequence in ("<Map>", "<Unmap>", "<FocusIn>", "<FocusOut>"):
+            self.root.bind(sequence, lambda event: self.root.after_idle(self._update_window_active), add="+")
+        
+        # Render the last saved state right away, then revalidate in the background
+        state = self._load_snapshot()
+        # Compare against what is on disk so an unchanged state is not rewritten
+        self._last_snapshot = {key: value for key, value in state.items() if key != "saved_at"}
+        self._restore_ui_state(state)
+        self._load_saved_accounts(state)
+        self.root.after(SNAPSHOT_INTERVAL_MS, self._periodic_snapshot)
         
         # Bind window close event
         self.root.protocol("WM_DELETE_WINDOW", self._on_closing)
@@ -38,6 +71,7 @@ class EmailApp:
         
         ttk.Button(header_frame, text="New Email", command=self._create_new_email).pack(side=tk.LEFT, padx=5)
         ttk.Button(header_frame, text="Refresh", command=self._refresh_messages).pack(side=tk.LEFT, padx=5)
+        ttk.Button(header_frame, text="Search All", command=self._search_all_accounts).pack(side=tk.LEFT, padx=5)
         
         refresh_frame = ttk.Frame(header_frame)
         refresh_frame.pack(side=tk.LEFT, padx=5)
@@ -114,7 +148,7 @@ class EmailApp:
         self.message_label.grid(row=0, column=0, pady=5)
         
         # Create Treeview for messages with ID column
-        self.messages_tree = ttk.Treeview(messages_frame, columns=("ID", "From", "Subject", "Date"), show="headings")
+        self.messages_tree = ttk.Treeview(messages_frame, columns=("ID", "From", "Subject", "Date"), show="headings", selectmode="extended")
         self.messages_tree.grid(row=1, column=0, sticky="nsew")
         
         # Configure treeview columns
@@ -131,8 +165,21 @@ class EmailApp:
         scrollbar.grid(row=1, column=1, sticky="ns")
         self.messages_tree.configure(yscrollcommand=scrollbar.set)
         
+        # Unread messages are shown in bold
+        self.messages_tree.tag_configure('unseen', font=('TkDefaultFont', 9, 'bold'))
+        
+        # Add right-click menu for messages (applies to the whole selection)
+        self.message_menu = tk.Menu(self.root, tearoff=0)
+        self.message_menu.add_command(label="Mark as Read", command=lambda: self._mark_selected_messages(True))
+        self.message_menu.add_command(label="Mark as Unread", command=lambda: self._mark_selected_messages(False))
+        self.message_menu.add_separator()
+        self.message_menu.add_command(label="Delete Selected", command=self._delete_selected_messages, foreground="red")
+        self.message_menu.add_command(label="Delete All Messages", command=self._delete_all_messages, foreground="red")
+        
         # Bind double-click event
         self.messages_tree.bind("<Double-1>", self._show_message_content)
+        self.messages_tree.bind("<Button-3>", self._show_message_menu)  # Right-click
+        self.messages_tree.bind("<Delete>", lambda event: self._delete_selected_messages())
 
     def _create_status_bar(self):
         self.status_var = tk.StringVar()
@@ -141,46 +188,94 @@ class EmailApp:
         self.status_var.set("Ready")
         
     def _create_new_email(self):
-        if self.client.create_account():
+        # Detach the view from the current account while the new one is being
+        # created, so a refresh running meanwhile has nothing to sign in or list
+        self._auth_needed = None
+        self.selected_email = None
+        self.current_messages = []
+        self.messages_tree.delete(*self.messages_tree.get_children())
+        self.message_label.config(text="Messages")
+        self.status_var.set("Creating new email...")
+        
+        def finish(created, account, password):
+            if not created:
+                messagebox.showerror("Error", "Failed to create new email account")
+                self._reselect_account()
+                return
             # Check if account creation was successful
-            if not self.client.account:
+            if not account:
                 messagebox.showerror("Error", "Failed to create account - no account data returned")
+                self._reselect_account()
                 return
-                
-            email = self.client.account["address"]
-            password = self.client.current_password
+            
+            email = account["address"]
             
             # Save and display the new account
             self.storage.save_account(email, password)
             item = self.accounts_tree.insert("", tk.END, values=(email, password))
+            if self.selected_email is not None:
+                # Another account was picked meanwhile and has since signed in
+                self.status_var.set(f"New email created: {email}")
+                return
             
             # Select and highlight the new account
             self.accounts_tree.selection_set(item)
             self.accounts_tree.see(item)
-            self.selected_email = email
-            self.message_label.config(text=f"Messages for {email}")
+            self._highlight_account(item)
+            self._show_account(email)  # create_account already authenticated the client
             
             messagebox.showinfo("Success", f"New email created:\nEmail: {email}\nPassword: {password}")
             self._refresh_messages()
-        else:
-            messagebox.showerror("Error", "Failed to create new email account")
+        
+        def work(post):
+            with self._account_lock:
+                created = self.client.create_account()
+                account = dict(self.client.account) if self.client.account else None
+                password = self.client.current_password
+            post(finish, created, account, password)
+        
+        self._run_in_background(work)
+
+    def _reselect_account(self):
+        """Go back to the account still selected in the sidebar, if nothing else was picked"""
+        if self.selected_email is None:
+            self._on_account_select(None)
 
-    def _load_saved_accounts(self):
-        """Load saved accounts and select the first one"""
+    def _load_saved_accounts(self, state):
+        """Load saved accounts and select the last viewed one (or the first)"""
         accounts = self.storage.get_accounts()
-        first_item = None
+        items = {}
         for account in accounts:
             item = self.accounts_tree.insert("", tk.END, values=(account["email"], account["password"]))
-            if not first_item:
-                first_item = item
-        
-        # Select and authenticate the first account if available
-        if first_item:
-            self.accounts_tree.selection_set(first_item)
-            self.accounts_tree.see(first_item)
-            # Trigger the account selection event
-            self._on_account_select(None)
-            
+            items.setdefault(account["email"], (item, account["password"]))
+        if not items:
+            return
+        
+        email = state.get("selected_email")
+        if email not in items:
+            email = accounts[0]["email"]
+        item, password = items[email]
+        self.accounts_tree.selection_set(item)
+        self.accounts_tree.see(item)
+        self._highlight_account(item)
+        self._show_account(email)
+        
+        # Show the saved message list until the background refresh replaces it
+        if email == state.get("selected_email") and state.get("messages"):
+            try:
+                self.current_messages = [MessageSummary.from_dict(data) for data in state["messages"]]
+            except (TypeError, KeyError):
+                self.current_messages = []
+            self._apply_messages(self.current_messages)
+            self.status_var.set(f"Showing messages saved at {state.get('saved_at', 'last run')} - updating...")
+        
+        # Authenticate quietly: if the network is down the snapshot stays on screen
+        self._auth_needed = (email, password, False)
+        self.scheduler.refresh_now()
+        if state.get("auto_refresh"):
+            self.auto_refresh_var.set(True)
+            self.scheduler.set_auto(True)
+
     def _on_account_select(self, event=None):
         """Handle account selection (can be triggered manually or by event)"""
         selection = self.accounts_tree.selection()
@@ -188,57 +283,131 @@ class EmailApp:
             item = selection[0]
             email = self.accounts_tree.item(item)["values"][0]
             password = self.accounts_tree.item(item)["values"][1]
+            if email == self.selected_email:
+                return
             
-            # Update selected email
-            self.selected_email = email
-            self.message_label.config(text=f"Messages for {email}")
-            
-            # Highlight selected account (remove previous tags)
-            for item in self.accounts_tree.get_children():
-                self.accounts_tree.item(item, tags=())
-            self.accounts_tree.item(selection, tags=('selected',))
-            self.accounts_tree.tag_configure('selected', background='lightblue')
+            self._highlight_account(item)
+            self._show_account(email)
             
-            # Authenticate with selected account
-            if self.client.authenticate_account(email, password):
-                self._refresh_messages()
-                self.status_var.set(f"Authenticated as {email}")
-            else:
-                messagebox.showerror("Error", "Failed to authenticate account")
-                self.selected_email = None
-                self.message_label.config(text="Messages")
+            # Authenticate with selected account on the refresh worker
+            self._auth_needed = (email, password, True)
+            self.status_var.set(f"Authenticating as {email}...")
+            self._refresh_messages()
+
+    def _highlight_account(self, item):
+        # Highlight selected account (remove previous tags)
+        for other in self.accounts_tree.get_children():
+            self.accounts_tree.item(other, tags=())
+        self.accounts_tree.item(item, tags=('selected',))
+        self.accounts_tree.tag_configure('selected', background='lightblue')
+
+    def _show_account(self, email):
+        """Switch the messages view to another account"""
+        self.selected_email = email
+        self.message_label.config(text=f"Messages for {email}")
+        self.current_messages = []
+        self.messages_tree.delete(*self.messages_tree.get_children())
 
     def _refresh_messages(self):
-        """Refresh messages with error handling"""
-        try:
+        """Request a refresh; overlapping requests are merged by the scheduler"""
+        if not self.selected_email:
             self.messages_tree.delete(*self.messages_tree.get_children())
-            if not self.selected_email:
-                return
-                
+            return
+        self.scheduler.refresh_now()
+
+    def _fetch_messages(self):
+        """Runs on the scheduler's worker thread"""
+        with self._account_lock:
+            # Read the selection under the lock: account creation may have
+            # changed it while this fetch was waiting
+            email = self.selected_email
+            if not email:
+                return None, []
+            pending = self._auth_needed
+            if pending and pending[0] == email:
+                if not self.client.authenticate_account(pending[0], pending[1]):
+                    raise AuthenticationFailed(email, pending[2])
+                if self._auth_needed is pending:
+                    self._auth_needed = None
             messages = self.client.get_messages()
-            if messages:
-                for msg in messages:
-                    # Get the message ID correctly
-                    msg_id = msg.get('id', '')
-                    if not msg_id and '@id' in msg:
-                        msg_id = msg['@id'].split('/')[-1]
-                    
-                    self.messages_tree.insert("", tk.END, values=(
-                        msg_id,  # Store the cleaned message ID
-                        msg.get("from", {}).get("address", "N/A"),
-                        msg.get("subject", "N/A"),
-                        msg.get("createdAt", "N/A")
-                    ))
-                if not self.auto_refresh_var.get():
-                    self.status_var.set(f"Found {len(messages)} messages")
+            if messages is not None:
+                self.client.prefetcher.schedule(messages)
+        if messages is None:
+            raise RuntimeError("could not fetch messages")
+        return email, messages
+
+    def _on_refresh_result(self, result, error):
+        if isinstance(error, AuthenticationFailed) and error.interactive and error.email == self.selected_email:
+            self._auth_needed = None
+            messagebox.showerror("Error", "Failed to authenticate account")
+            self.selected_email = None
+            self.message_label.config(text="Messages")
+            self.status_var.set("Ready")
+            return
+        if error is not None:
+            if self.scheduler.auto:
+                self.status_var.set(f"Error refreshing messages: {error} - retrying in {self.scheduler.next_delay()} seconds")
+            else:
+                self.status_var.set(f"Error refreshing messages: {error}")
+            return
+        
+        email, messages = result
+        # Drop results that belong to an account we have since switched away from
+        if email is None or email != self.selected_email:
+            return
+        self.current_messages = messages
+        added = self._apply_messages(messages)
+        if self.scheduler.auto:
+            new_text = f"{added} new - " if added else ""
+            self.status_var.set(f"Auto-refresh active - {new_text}Next refresh in {self.scheduler.next_delay()} seconds")
+        elif messages:
+            self.status_var.set(f"Found {len(messages)} messages")
+        else:
+            self.status_var.set("No messages found")
+
+    def _apply_messages(self, messages):
+        """Update the messages list in place, keeping selection and scroll position.
+
+        Returns the number of rows that were added.
+        """
+        tree = self.messages_tree
+        current_ids = {msg.id for msg in messages}
+        stale = [item for item in tree.get_children() if item not in current_ids]
+        if stale:
+            tree.delete(*stale)
+        
+        added = 0
+        for index, msg in enumerate(messages):
+            values = (msg.id, msg.sender, msg.subject or "N/A", msg.created_at)
+            tags = () if msg.seen else ('unseen',)
+            if tree.exists(msg.id):
+                tree.item(msg.id, values=values, tags=tags)
+                if tree.index(msg.id) != index:
+                    tree.move(msg.id, "", index)
             else:
-                if not self.auto_refresh_var.get():
-                    self.status_var.set("No messages found")
-        except Exception as e:
-            self.status_var.set(f"Error refreshing messages: {str(e)}")
-            if self.auto_refresh_var.get():
-                self._stop_auto_refresh()
-                self.auto_refresh_var.set(False)
+                tree.insert("", index, iid=msg.id, values=values, tags=tags)
+                added += 1
+        return added
+
+    def _get_refresh_interval(self):
+        """Read the interval spinbox, falling back to 30 seconds if it is invalid"""
+        try:
+            interval = int(self.refresh_interval.get())
+        except ValueError:
+            interval = 30
+            self.refresh_interval.set("30")
+        return max(5, min(interval, 300))
+
+    def _update_window_active(self):
+        try:
+            active = self.root.state() != "iconic" and self.root.focus_displayof() is not None
+        except (tk.TclError, KeyError):
+            # focus_displayof can fail while a child window is being destroyed
+            return
+        if active != self.scheduler.active:
+            self.scheduler.set_active(active)
+            if self.scheduler.auto:
+                self.status_var.set("Auto-refresh active" if active else "Auto-refresh paused while window is inactive")
 
     def _show_message_content(self, event):
         selection = self.messages_tree.selection()
@@ -286,6 +455,211 @@ Date: {date}
             text_widget.insert(tk.END, "Failed to load message content")
             text_widget.config(state='disabled')
 
+    def _search_all_accounts(self):
+        """Search every saved account and list the matches in a new window"""
+        accounts = self.storage.get_accounts()
+        if not accounts:
+            messagebox.showwarning("Warning", "No saved accounts to search")
+            return
+        query = simpledialog.askstring("Search All Accounts", "Search sender or subject:", parent=self.root)
+        if not query:
+            return
+        
+        results_window = tk.Toplevel(self.root)
+        results_window.title(f"TempBox - Results for '{query}'")
+        results_window.geometry("700x400")
+        
+        results_tree = ttk.Treeview(results_window, columns=("Account", "From", "Subject", "Date"), show="headings")
+        for column in ("Account", "From", "Subject", "Date"):
+            results_tree.heading(column, text=column)
+        results_tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        scrollbar = ttk.Scrollbar(results_window, orient=tk.VERTICAL, command=results_tree.yview)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        results_tree.configure(yscrollcommand=scrollbar.set)
+        results_tree.bind("<Double-1>", lambda event: self._open_search_hit(results_tree))
+        
+        found = []
+        
+        def show_hits(hits):
+            if not results_window.winfo_exists():
+                return
+            results_tree.delete(*results_tree.get_children())
+            for hit in hits:
+                results_tree.insert("", tk.END, values=(hit.account, hit.message.sender, hit.message.subject or "N/A", hit.message.created_at))
+        
+        def add_hits(account_hits):
+            # Show matches as each account finishes; the final call re-ranks them
+            found.extend(account_hits)
+            show_hits(sorted(found, key=lambda hit: hit.message.created_at, reverse=True))
+        
+        def finish(hits, failed):
+            show_hits(hits)
+            status = f"Found {len(hits)} messages across {len(accounts)} accounts"
+            if failed:
+                status += f" ({len(failed)} accounts could not be fully searched)"
+            self.status_var.set(status)
+        
+        self.status_var.set(f"Searching {len(accounts)} accounts...")
+        
+        def work(post):
+            hits, failed = federated_search(
+                query, accounts,
+                on_hits=lambda account_hits: post(add_hits, account_hits),
+                rate_limiter=self.client.rate_limiter
+            )
+            post(finish, hits, failed)
+        
+        self._run_in_background(work)
+
+    def _open_search_hit(self, results_tree):
+        """Switch to the account of the double-clicked search result"""
+        selection = results_tree.selection()
+        if not selection:
+            return
+        email = results_tree.item(selection[0])["values"][0]
+        for item in self.accounts_tree.get_children():
+            if self.accounts_tree.item(item)["values"][0] == email:
+                self.accounts_tree.selection_set(item)
+                self.accounts_tree.see(item)
+                self._on_account_select(None)
+                break
+
+    def _show_message_menu(self, event):
+        item = self.messages_tree.identify_row(event.y)
+        if item:
+            # Keep an existing multi-selection when right-clicking inside it
+            if item not in self.messages_tree.selection():
+                self.messages_tree.selection_set(item)
+            self.message_menu.post(event.x_root, event.y_root)
+
+    def _bulk_token(self):
+        """Token of the account being shown, or None while it is still signing in"""
+        account = self.client.account
+        if self._auth_needed or not account or account["address"] != self.selected_email:
+            self.status_var.set("Still signing in - try again in a moment")
+            return None
+        return self.client.token
+
+    def _mark_selected_messages(self, seen):
+        message_ids = list(self.messages_tree.selection())
+        if not message_ids:
+            self.status_var.set("No messages selected")
+            return
+        token = self._bulk_token()
+        if not token:
+            return
+        
+        def on_success(message_id):
+            if self.messages_tree.exists(message_id):
+                self.messages_tree.item(message_id, tags=() if seen else ('unseen',))
+        
+        verb = "Marked as read" if seen else "Marked as unread"
+        self._run_bulk_action(
+            "Updating", verb,
+            lambda on_result: self.client.mark_messages_seen(message_ids, seen, on_result, token),
+            on_success
+        )
+
+    def _delete_selected_messages(self):
+        message_ids = list(self.messages_tree.selection())
+        if not message_ids:
+            self.status_var.set("No messages selected")
+            return
+        token = self._bulk_token()
+        if not token:
+            return
+        if not messagebox.askyesno("Confirm Delete", f"Delete {len(message_ids)} selected message(s)?"):
+            return
+        self._run_bulk_action(
+            "Deleting", "Deleted",
+            lambda on_result: self.client.delete_messages(message_ids, on_result, token),
+            self._remove_message_row
+        )
+
+    def _delete_all_messages(self):
+        if not self.selected_email:
+            return
+        token = self._bulk_token()
+        if not token:
+            return
+        if not messagebox.askyesno("Confirm Delete", f"Delete ALL messages for {self.selected_email}?"):
+            return
+        self._run_bulk_action(
+            "Deleting", "Deleted",
+            lambda on_result: self.client.delete_all_messages(on_result=on_result, token=token),
+            self._remove_message_row
+        )
+
+    def _remove_message_row(self, message_id):
+        if self.messages_tree.exists(message_id):
+            self.messages_tree.delete(message_id)
+
+    def _run_bulk_action(self, pending, verb, action, on_success):
+        """Run a bulk client action in the background, updating rows as results arrive"""
+        self.status_var.set(f"{pending} messages...")
+        progress = {"done": 0, "failed": 0}
+        
+        def apply_result(message_id, ok):
+            progress["done"] += 1
+            if ok:
+                on_success(message_id)
+            else:
+                progress["failed"] += 1
+            self.status_var.set(f"{verb} {progress['done'] - progress['failed']} messages...")
+        
+        def finish(succeeded, failed, incomplete):
+            status = f"{verb} {len(succeeded)} messages" + (f", {len(failed)} failed" if failed else "")
+            if incomplete:
+                status += " - inbox could not be fully listed"
+            self.status_var.set(status)
+            problems = []
+            if failed:
+                problems.append(f"{len(failed)} message(s) could not be updated.")
+            if incomplete:
+                problems.append("The inbox could not be fully listed, so some messages were not processed.")
+            if problems:
+                messagebox.showwarning("Partial Failure", " ".join(problems) + " Try again later.")
+        
+        def work(post):
+            result = action(lambda message_id, ok: post(apply_result, message_id, ok))
+            post(finish, result.succeeded, result.failed, result.incomplete)
+        
+        self._run_in_background(work)
+
+    def _run_in_background(self, work):
+        """Run work(post) on a worker thread.
+
+        post(func, *args) queues func to be called on the Tk thread, so the
+        worker never touches Tk itself.
+        """
+        def post(func, *args):
+            self._ui_queue.put((func, args))
+        
+        def runner():
+            try:
+                work(post)
+            finally:
+                post(self._finish_background_job)
+        
+        self._background_jobs += 1
+        threading.Thread(target=runner, daemon=True).start()
+        if self._background_jobs == 1:
+            self.root.after(UI_POLL_INTERVAL_MS, self._drain_ui_queue)
+
+    def _finish_background_job(self):
+        self._background_jobs -= 1
+
+    def _drain_ui_queue(self):
+        while True:
+            try:
+                func, args = self._ui_queue.get_nowait()
+            except queue.Empty:
+                break
+            func(*args)
+        # Keep polling only while some job may still post results
+        if self._background_jobs:
+            self.root.after(UI_POLL_INTERVAL_MS, self._drain_ui_queue)
+
     def _remove_account(self):
         selection = self.accounts_tree.selection()
         if selection:
@@ -299,6 +673,7 @@ Date: {date}
                 # Clear messages if this was the selected account
                 if self.selected_email == email:
                     self.selected_email = None
+                    self.current_messages = []
                     self.messages_tree.delete(*self.messages_tree.get_children())
                     self.message_label.config(text="Messages")
                 self.status_var.set(f"Removed account: {email}")
@@ -315,51 +690,66 @@ Date: {date}
             messagebox.showwarning("Warning", "Please select an email account first")
             self.auto_refresh_var.set(False)
             return
-            
-        if self.is_refreshing:
-            return
-            
-        self.is_refreshing = True
-        
-        def refresh_loop():
-            while self.is_refreshing and self.auto_refresh_var.get():
-                try:
-                    # Update UI in thread-safe way
-                    self.root.after(0, self._refresh_messages)
-                    # Get interval from spinbox, default to 30 if invalid
-                    try:
-                        interval = int(self.refresh_interval.get())
-                    except ValueError:
-                        interval = 30
-                        self.refresh_interval.set("30")
-                    
-                    # Show refresh status
-                    self.root.after(0, lambda: self.status_var.set(f"Auto-refresh active - Next refresh in {interval} seconds"))
-                    
-                    # Sleep in small increments to check if we should stop
-                    for _ in range(interval):
-                        if not self.is_refreshing:
-                            break
-                        time.sleep(1)
-                        
-                except Exception as e:
-                    self.root.after(0, lambda: self.status_var.set(f"Auto-refresh error: {str(e)}"))
-                    self.is_refreshing = False
-                    self.auto_refresh_var.set(False)
-                    break
-        
-        self.refresh_thread = threading.Thread(target=refresh_loop, daemon=True)
-        self.refresh_thread.start()
-        self.status_var.set("Auto-refresh started")
+        
+        self.scheduler.set_auto(True)
+        self.status_var.set(f"Auto-refresh started - Next refresh in {self.scheduler.next_delay()} seconds")
     
     def _stop_auto_refresh(self):
-        self.is_refreshing = False
-        if self.refresh_thread and self.refresh_thread.is_alive():
-            self.refresh_thread.join(timeout=1.0)
+        self.scheduler.set_auto(False)
     
+    def _load_snapshot(self):
+        state = self.storage.load_state()
+        return state if isinstance(state, dict) else {}
+
+    def _restore_ui_state(self, state):
+        if state.get("geometry"):
+            try:
+                self.root.geometry(state["geometry"])
+            except tk.TclError:
+                pass
+        if state.get("refresh_interval"):
+            self.refresh_interval.set(str(state["refresh_interval"]))
+
+    def _snapshot_state(self):
+        """Collect what is needed to redraw the current screen on the next launch"""
+        messages = []
+        for msg in self.current_messages:
+            # Rows may have been deleted or marked read/unread since the last refresh
+            if self.messages_tree.exists(msg.id):
+                data = msg.to_dict()
+                data["seen"] = 'unseen' not in self.messages_tree.item(msg.id, "tags")
+                messages.append(data)
+        # A minimized window reports a meaningless size, so keep the last one
+        if self.root.state() in ("normal", "zoomed"):
+            geometry = self.root.geometry()
+        else:
+            geometry = self._last_snapshot.get("geometry")
+        return {
+            "selected_email": self.selected_email,
+            "messages": messages,
+            "auto_refresh": bool(self.auto_refresh_var.get()),
+            "refresh_interval": self._get_refresh_interval(),
+            "geometry": geometry,
+        }
+
+    def _save_snapshot(self):
+        state = self._snapshot_state()
+        if state == self._last_snapshot:
+            return
+        try:
+            self.storage.save_state(dict(state, saved_at=datetime.now().strftime("%Y-%m-%d %H:%M")))
+            self._last_snapshot = state
+        except OSError as e:
+            self.status_var.set(f"Could not save state: {e}")
+
+    def _periodic_snapshot(self):
+        self._save_snapshot()
+        self.root.after(SNAPSHOT_INTERVAL_MS, self._periodic_snapshot)
+
     def _on_closing(self):
         """Handle window close event"""
-        self._stop_auto_refresh()
+        self.scheduler.stop()
+        self._save_snapshot()
         self.root.destroy()
 
     def _show_account_menu(self, event):
@@ -1,4 +1,6 @@
 from email_client import TempEmailClient
+from federated_search import federated_search
+from storage import Storage
 import sys
 import time
 from colorama import init, Fore, Style
@@ -23,7 +25,27 @@ def print_menu():
     print(f"{Fore.GREEN}5.{Style.RESET_ALL} View message details")
     print(f"{Fore.GREEN}6.{Style.RESET_ALL} Delete message")
     print(f"{Fore.GREEN}7.{Style.RESET_ALL} Save message to file")
-    print(f"{Fore.GREEN}8.{Style.RESET_ALL} Exit")
+    print(f"{Fore.GREEN}8.{Style.RESET_ALL} Bulk delete messages")
+    print(f"{Fore.GREEN}9.{Style.RESET_ALL} Mark messages as read/unread")
+    print(f"{Fore.GREEN}10.{Style.RESET_ALL} Search all saved accounts")
+    print(f"{Fore.GREEN}11.{Style.RESET_ALL} Exit")
+
+def print_progress(message_id, ok):
+    mark = f"{Fore.GREEN}.{Style.RESET_ALL}" if ok else f"{Fore.RED}x{Style.RESET_ALL}"
+    print(mark, end="", flush=True)
+
+def print_bulk_summary(action, succeeded, failed, incomplete=False):
+    print()
+    if incomplete:
+        print(f"{Fore.RED}Could not list the whole inbox - some messages were not processed. Try again later.{Style.RESET_ALL}")
+    elif not succeeded and not failed:
+        print(f"{Fore.RED}No matching messages found{Style.RESET_ALL}")
+        return
+    print(f"{Fore.GREEN}{action} {len(succeeded)} messages{Style.RESET_ALL}")
+    if failed:
+        print(f"{Fore.RED}Failed for {len(failed)} messages:{Style.RESET_ALL}")
+        for msg_id in failed:
+            print(f"  {msg_id}")
 
 def main():
     print(f"{Fore.GREEN}Welcome to TempBox!{Style.RESET_ALL}")
@@ -33,7 +55,7 @@ def main():
         print_header()
         print_menu()
         
-        choice = input(f"\n{Fore.YELLOW}Enter your choice (1-8):{Style.RESET_ALL} ")
+        choice = input(f"\n{Fore.YELLOW}Enter your choice (1-11):{Style.RESET_ALL} ")
         
         if choice == "1":
             print(f"\n{Fore.BLUE}Creating new temporary email...{Style.RESET_ALL}")
@@ -64,9 +86,9 @@ def main():
             if results:
                 print(f"\n{Fore.GREEN}Found {len(results)} messages:{Style.RESET_ALL}")
                 for msg in results:
-                    print(f"\nID: {msg.get('id')[:8]}")
-                    print(f"From: {msg.get('from', {}).get('address', 'N/A')}")
-                    print(f"Subject: {msg.get('subject', 'N/A')}")
+                    print(f"\nID: {msg.id[:8]}")
+                    print(f"From: {msg.sender}")
+                    print(f"Subject: {msg.subject or 'N/A'}")
             else:
                 print(f"{Fore.RED}No messages found{Style.RESET_ALL}")
             input("\nPress Enter to continue...")
@@ -90,6 +112,48 @@ def main():
             input("\nPress Enter to continue...")
         
         elif choice == "8":
+            query = input(f"\n{Fore.YELLOW}Delete messages matching (leave empty for all):{Style.RESET_ALL} ").strip()
+            target = f"messages matching '{query}'" if query else "ALL messages"
+            confirm = input(f"{Fore.YELLOW}Delete {target}? (y/N):{Style.RESET_ALL} ")
+            if confirm.lower() == "y":
+                succeeded, failed, incomplete = client.delete_all_messages(query or None, on_result=print_progress)
+                print_bulk_summary("Deleted", succeeded, failed, incomplete)
+            input("\nPress Enter to continue...")
+        
+        elif choice == "9":
+            query = input(f"\n{Fore.YELLOW}Update messages matching (leave empty for all):{Style.RESET_ALL} ").strip()
+            seen = input(f"{Fore.YELLOW}Mark as (r)ead or (u)nread? (default r):{Style.RESET_ALL} ").lower() != "u"
+            succeeded, failed, incomplete = client.mark_all_messages_seen(seen, query or None, on_result=print_progress)
+            print_bulk_summary("Marked as read" if seen else "Marked as unread", succeeded, failed, incomplete)
+            input("\nPress Enter to continue...")
+        
+        elif choice == "10":
+            accounts = Storage().get_accounts()
+            if not accounts:
+                print(f"{Fore.RED}No saved accounts{Style.RESET_ALL}")
+            else:
+                query = input(f"\n{Fore.YELLOW}Enter search term:{Style.RESET_ALL} ")
+                try:
+                    limit = int(input(f"{Fore.YELLOW}Stop after how many matches? (default all):{Style.RESET_ALL} ") or 0)
+                except ValueError:
+                    limit = 0
+                print(f"{Fore.BLUE}Searching {len(accounts)} accounts...{Style.RESET_ALL}")
+                hits, failed = federated_search(query, accounts, limit or None, rate_limiter=client.rate_limiter)
+                if hits:
+                    print(f"\n{Fore.GREEN}Found {len(hits)} messages:{Style.RESET_ALL}")
+                    for hit in hits:
+                        print(f"\nAccount: {hit.account}")
+                        print(f"ID: {hit.message.id[:8]}")
+                        print(f"From: {hit.message.sender}")
+                        print(f"Subject: {hit.message.subject or 'N/A'}")
+                        print(f"Date: {hit.message.created_at}")
+                else:
+                    print(f"{Fore.RED}No messages found{Style.RESET_ALL}")
+                if failed:
+                    print(f"\n{Fore.RED}Could not fully search: {', '.join(failed)}{Style.RESET_ALL}")
+            input("\nPress Enter to continue...")
+        
+        elif choice == "11":
             print(f"{Fore.GREEN}Thank you for using Temporary Email System. Goodbye!{Style.RESET_ALL}")
             sys.exit()
         
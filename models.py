@@ -0,0 +1,51 @@
+import sys
+
+
+class MessageSummary:
+    """Compact listing entry for a message.
+
+    Only the fields needed to list, search and track messages are kept;
+    the full message (body, recipients, attachments) is fetched on demand
+    with TempEmailClient.get_message_content(summary.id).
+    """
+    __slots__ = ('id', 'sender', 'subject', 'created_at', 'seen', 'has_attachments')
+
+    def __init__(self, id, sender, subject, created_at, seen=False, has_attachments=False):
+        self.id = id
+        # Many messages share a sender, so keep a single copy of each address
+        self.sender = sys.intern(sender)
+        self.subject = subject
+        self.created_at = created_at
+        self.seen = seen
+        self.has_attachments = has_attachments
+
+    @classmethod
+    def from_api(cls, data):
+        """Build a summary from a hydra:member entry of GET /messages"""
+        # Extract the ID from @id if it exists, otherwise use id
+        msg_id = data.get('@id', '').split('/')[-1]
+        if not msg_id:
+            msg_id = data.get('id', '')
+        return cls(
+            msg_id,
+            (data.get('from') or {}).get('address', 'N/A'),
+            data.get('subject', ''),
+            data.get('createdAt', 'N/A'),
+            bool(data.get('seen', False)),
+            bool(data.get('hasAttachments', data.get('attachments')))
+        )
+
+    def to_dict(self):
+        """Plain dict form used for the local state snapshot"""
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(**{name: data[name] for name in cls.__slots__ if name in data})
+
+    def matches(self, query):
+        """Check whether the (lowercased) query appears in the subject or sender"""
+        return query in self.subject.lower() or query in self.sender.lower()
+
+    def __repr__(self):
+        return f"MessageSummary(id={self.id!r}, sender={self.sender!r}, subject={self.subject!r})"
@@ -0,0 +1,131 @@
+import queue
+import threading
+
+POLL_INTERVAL_MS = 100
+MAX_BACKOFF = 300
+
+
+class RefreshScheduler:
+    """Runs message refreshes off the Tk thread, one at a time.
+
+    - Refreshes requested while a fetch is in flight are coalesced into a
+      single follow-up fetch.
+    - Auto-refresh ticks never overlap a fetch; the next tick is scheduled
+      only once the current fetch has finished.
+    - Failed fetches back off exponentially (up to MAX_BACKOFF seconds)
+      instead of switching auto-refresh off.
+    - While inactive (window minimized or unfocused) ticks are skipped and a
+      single catch-up refresh runs when the window becomes active again.
+
+    fetch() runs on a worker thread and should raise on failure;
+    on_result(result, error) and get_interval() are called on the Tk thread,
+    as must every method of this class.
+    """
+    def __init__(self, root, fetch, on_result, get_interval):
+        self.root = root
+        self.fetch = fetch
+        self.on_result = on_result
+        self.get_interval = get_interval
+        self.auto = False
+        self.active = True
+        self.failures = 0
+        self._in_flight = False
+        self._pending = False
+        self._missed_tick = False
+        self._stopped = False
+        self._tick_id = None
+        self._results = queue.Queue()
+
+    @property
+    def in_flight(self):
+        return self._in_flight
+
+    def refresh_now(self):
+        """Refresh as soon as possible, merging with a fetch already running"""
+        if self._stopped:
+            return
+        if self._in_flight:
+            self._pending = True
+            return
+        self._start_fetch()
+
+    def set_auto(self, enabled):
+        self.auto = enabled
+        self.failures = 0
+        self._missed_tick = False
+        if enabled and not self._in_flight:
+            self._schedule_tick()
+        elif not enabled:
+            self._cancel_tick()
+
+    def set_active(self, active):
+        if active == self.active:
+            return
+        self.active = active
+        if active and self._missed_tick:
+            self._missed_tick = False
+            self.refresh_now()
+
+    def stop(self):
+        self._stopped = True
+        self.auto = False
+        self._cancel_tick()
+
+    def next_delay(self):
+        """Seconds until the next auto-refresh, including any error backoff"""
+        interval = self.get_interval()
+        if self.failures:
+            return min(interval * 2 ** min(self.failures, 6), max(interval, MAX_BACKOFF))
+        return interval
+
+    def _schedule_tick(self):
+        self._cancel_tick()
+        if self.auto and not self._stopped:
+            self._tick_id = self.root.after(int(self.next_delay() * 1000), self._on_tick)
+
+    def _cancel_tick(self):
+        if self._tick_id is not None:
+            self.root.after_cancel(self._tick_id)
+            self._tick_id = None
+
+    def _on_tick(self):
+        self._tick_id = None
+        if self._in_flight:
+            return
+        if not self.active:
+            # Catch up once when the window is back instead of polling unseen
+            self._missed_tick = True
+            return
+        self._start_fetch()
+
+    def _start_fetch(self):
+        self._in_flight = True
+        self._cancel_tick()
+        threading.Thread(target=self._run_fetch, daemon=True).start()
+        self.root.after(POLL_INTERVAL_MS, self._poll)
+
+    def _run_fetch(self):
+        try:
+            self._results.put((self.fetch(), None))
+        except Exception as e:
+            self._results.put((None, e))
+
+    def _poll(self):
+        try:
+            result, error = self._results.get_nowait()
+        except queue.Empty:
+            if not self._stopped:
+                self.root.after(POLL_INTERVAL_MS, self._poll)
+            return
+
+        self._in_flight = False
+        if self._stopped:
+            return
+        self.failures = self.failures + 1 if error is not None else 0
+        self.on_result(result, error)
+
+        if self._pending:
+            self._pending = False
+            self._start_fetch()
+        else:
+            self._schedule_tick()
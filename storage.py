@@ -4,6 +4,7 @@ import os
 class Storage:
     def __init__(self):
         self.file_path = "tempbox_accounts.json"
+        self.state_path = "tempbox_state.json"
         self.accounts = self._load_accounts()
 
     def _load_accounts(self):
@@ -30,4 +31,21 @@ class Storage:
         """Remove an account from storage"""
         self.accounts = [acc for acc in self.accounts if acc["email"] != email]
         with open(self.file_path, 'w') as f:
-            json.dump(self.accounts, f, indent=2)
\ No newline at end of file
+            json.dump(self.accounts, f, indent=2)
+
+    def load_state(self):
+        """Load the last saved GUI state snapshot, if any"""
+        if os.path.exists(self.state_path):
+            try:
+                with open(self.state_path, 'r') as f:
+                    return json.load(f)
+            except:
+                return None
+        return None
+
+    def save_state(self, state):
+        """Save a GUI state snapshot, replacing the previous one atomically"""
+        tmp_path = self.state_path + ".tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(state, f)
+        os.replace(tmp_path, self.state_path)
\ No newline at end of file
@@ -0,0 +1,61 @@
+import pytest
+
+pytest.importorskip("requests")
+
+import federated_search
+from federated_search import SearchHit, score_message
+from models import MessageSummary
+
+
+def message(msg_id, sender, subject, created_at):
+    return MessageSummary(msg_id, sender, subject, created_at)
+
+
+def test_score_prefers_exact_sender_then_sender_then_subject():
+    query = "alice@example.com"
+    assert score_message(message("1", "alice@example.com", "", ""), query) == 3
+    assert score_message(message("2", "Alice@Example.com", "", ""), query) == 3
+    assert score_message(message("3", "x", "", ""), "x") == 3
+    assert score_message(message("4", "alice@example.com", "", ""), "alice") == 2
+    assert score_message(message("5", "bob@example.com", "Note from alice", ""), "alice") == 1
+    assert score_message(message("6", "bob@example.com", "Hello", ""), "alice") == 0
+
+
+def test_results_are_ranked_by_score_then_newest(monkeypatch):
+    inboxes = {
+        "a@x": [
+            SearchHit("a@x", message("1", "shop@x", "alice order", "2024-01-03"), 1),
+            SearchHit("a@x", message("2", "alice@x", "", "2024-01-01"), 2),
+        ],
+        "b@x": [
+            SearchHit("b@x", message("3", "alice@x", "", "2024-01-02"), 2),
+            SearchHit("b@x", message("4", "news@x", "alice weekly", "2024-01-04"), 1),
+        ],
+    }
+
+    def fake_search_account(account, query, rate_limiter, counter):
+        hits = inboxes[account["email"]]
+        counter.add(len(hits))
+        return hits, True
+
+    monkeypatch.setattr(federated_search, "_search_account", fake_search_account)
+    accounts = [{"email": email, "password": "p"} for email in inboxes]
+
+    hits, failed = federated_search.federated_search("alice", accounts)
+
+    assert failed == []
+    assert [hit.message.id for hit in hits] == ["3", "2", "4", "1"]
+
+
+def test_partly_searched_accounts_are_reported(monkeypatch):
+    def fake_search_account(account, query, rate_limiter, counter):
+        hit = SearchHit(account["email"], message("1", "alice@x", "", "2024-01-01"), 2)
+        return [hit], account["email"] != "broken@x"
+
+    monkeypatch.setattr(federated_search, "_search_account", fake_search_account)
+    accounts = [{"email": "ok@x", "password": "p"}, {"email": "broken@x", "password": "p"}]
+
+    hits, failed = federated_search.federated_search("alice", accounts)
+
+    assert len(hits) == 2
+    assert failed == ["broken@x"]
@@ -0,0 +1,48 @@
+from models import MessageSummary
+
+
+def test_from_api_keeps_only_listing_fields():
+    summary = MessageSummary.from_api({
+        "@id": "/messages/abc123",
+        "@type": "Message",
+        "id": "ignored",
+        "from": {"address": "alice@example.com", "name": "Alice"},
+        "to": [{"address": "me@example.com", "name": ""}],
+        "subject": "Reset your password",
+        "intro": "Click the link below",
+        "createdAt": "2024-05-01T10:00:00+00:00",
+        "seen": True,
+        "hasAttachments": True,
+    })
+
+    assert summary.id == "abc123"
+    assert summary.sender == "alice@example.com"
+    assert summary.subject == "Reset your password"
+    assert summary.created_at == "2024-05-01T10:00:00+00:00"
+    assert summary.seen is True
+    assert summary.has_attachments is True
+    assert not hasattr(summary, "__dict__")
+
+
+def test_from_api_fills_defaults_for_missing_fields():
+    summary = MessageSummary.from_api({"id": "xyz", "from": None})
+
+    assert summary.id == "xyz"
+    assert summary.sender == "N/A"
+    assert summary.subject == ""
+    assert summary.seen is False
+    assert summary.has_attachments is False
+
+
+def test_senders_are_interned():
+    first = MessageSummary.from_api({"id": "1", "from": {"address": "".join(["bob", "@example.com"])}})
+    second = MessageSummary.from_api({"id": "2", "from": {"address": "".join(["bob", "@example.com"])}})
+
+    assert first.sender is second.sender
+
+
+def test_snapshot_round_trip():
+    summary = MessageSummary("1", "bob@example.com", "Hi", "2024-01-01", seen=True)
+    restored = MessageSummary.from_dict(summary.to_dict())
+
+    assert restored.to_dict() == summary.to_dict()
@@ -0,0 +1,155 @@
+import itertools
+
+import pytest
+
+import refresh_scheduler
+from refresh_scheduler import RefreshScheduler, POLL_INTERVAL_MS
+
+
+class FakeRoot:
+    """Stands in for Tk: after() callbacks run when the virtual clock is advanced"""
+    def __init__(self):
+        self.now = 0
+        self._jobs = {}
+        self._ids = itertools.count()
+
+    def after(self, ms, func, *args):
+        job_id = next(self._ids)
+        self._jobs[job_id] = (self.now + ms, job_id, func, args)
+        return job_id
+
+    def after_cancel(self, job_id):
+        self._jobs.pop(job_id, None)
+
+    def advance(self, ms):
+        end = self.now + ms
+        while True:
+            due = [job for job in self._jobs.values() if job[0] <= end]
+            if not due:
+                break
+            when, job_id, func, args = min(due)
+            del self._jobs[job_id]
+            self.now = when
+            func(*args)
+        self.now = end
+
+
+class ImmediateThread:
+    """Runs the target on start() so fetches finish before the next poll"""
+    def __init__(self, target, daemon=None):
+        self.target = target
+
+    def start(self):
+        self.target()
+
+
+@pytest.fixture(autouse=True)
+def immediate_threads(monkeypatch):
+    monkeypatch.setattr(refresh_scheduler.threading, "Thread", ImmediateThread)
+
+
+def make_scheduler(fetch, interval=10):
+    root = FakeRoot()
+    results = []
+    scheduler = RefreshScheduler(root, fetch, lambda result, error: results.append((result, error)), lambda: interval)
+    return root, scheduler, results
+
+
+def test_overlapping_refreshes_are_coalesced():
+    calls = []
+    root, scheduler, results = make_scheduler(lambda: calls.append(1) or "ok")
+
+    scheduler.refresh_now()
+    scheduler.refresh_now()
+    scheduler.refresh_now()
+    assert len(calls) == 1
+    assert scheduler.in_flight
+
+    # The first result arrives and the queued requests run as a single fetch
+    root.advance(POLL_INTERVAL_MS)
+    assert len(calls) == 2
+    root.advance(60 * 1000)
+    assert len(calls) == 2
+    assert [error for _, error in results] == [None, None]
+    assert not scheduler.in_flight
+
+
+def test_auto_refresh_ticks_wait_for_the_fetch_in_flight():
+    calls = []
+    root, scheduler, _ = make_scheduler(lambda: calls.append(root.now) or "ok")
+    scheduler.set_auto(True)
+
+    root.advance(10 * 1000)
+    assert calls == [10 * 1000]
+    # The next tick is counted from when the fetch finished, not from the last tick
+    root.advance(10 * 1000)
+    assert calls == [10 * 1000]
+    root.advance(POLL_INTERVAL_MS)
+    assert calls == [10 * 1000, 20 * 1000 + POLL_INTERVAL_MS]
+
+
+def test_errors_back_off_instead_of_stopping_auto_refresh():
+    outcomes = iter([RuntimeError("offline"), RuntimeError("offline"), "ok"])
+    calls = []
+
+    def fetch():
+        calls.append(root.now)
+        outcome = next(outcomes)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    root, scheduler, results = make_scheduler(fetch)
+    scheduler.set_auto(True)
+
+    root.advance(10 * 1000 + POLL_INTERVAL_MS)
+    assert len(calls) == 1
+    assert scheduler.auto
+    assert scheduler.failures == 1
+    assert scheduler.next_delay() == 20
+
+    # Nothing is sent before the doubled delay has passed
+    root.advance(20 * 1000 - 1)
+    assert len(calls) == 1
+    root.advance(1 + POLL_INTERVAL_MS)
+    assert len(calls) == 2
+    assert scheduler.next_delay() == 40
+
+    root.advance(40 * 1000 + POLL_INTERVAL_MS)
+    assert len(calls) == 3
+    assert scheduler.failures == 0
+    assert scheduler.next_delay() == 10
+    assert [result for result, _ in results] == [None, None, "ok"]
+
+
+def test_backoff_is_capped():
+    root, scheduler, _ = make_scheduler(lambda: "ok")
+    scheduler.failures = 50
+    assert scheduler.next_delay() == refresh_scheduler.MAX_BACKOFF
+
+
+def test_inactive_window_skips_ticks_and_catches_up_once():
+    calls = []
+    root, scheduler, _ = make_scheduler(lambda: calls.append(1) or "ok")
+    scheduler.set_auto(True)
+    scheduler.set_active(False)
+
+    root.advance(60 * 1000)
+    assert calls == []
+
+    scheduler.set_active(True)
+    assert len(calls) == 1
+    root.advance(POLL_INTERVAL_MS)
+    assert len(calls) == 1
+
+
+def test_stop_discards_results_and_cancels_ticks():
+    calls = []
+    root, scheduler, results = make_scheduler(lambda: calls.append(1) or "ok")
+    scheduler.set_auto(True)
+    scheduler.refresh_now()
+    scheduler.stop()
+
+    root.advance(60 * 1000)
+    assert len(calls) == 1
+    assert results == []